@@ -0,0 +1,52 @@
+import re
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from generate_corpus import NAMES
+
+# 프롬프트의 "문단id<탭>단어번호|단어 ..." 줄과 그 안의 단어
+PARAGRAPH_LINE = re.compile(r"^\s*(\d+)\t(.*)$", re.MULTILINE)
+WORD_ITEM = re.compile(r"(\d+)\|(\S+)")
+
+
+# 이름인 단어를 [문단id, 단어번호, 단어번호, 0] 형식으로 돌려주는 가짜 chat completions 엔드포인트
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = request["messages"][0]["content"]
+        spans = [[int(pid), int(idx), int(idx), 0]
+                 for pid, text in PARAGRAPH_LINE.findall(prompt)
+                 for idx, word in WORD_ITEM.findall(text) if word in NAMES]
+        time.sleep(self.latency)
+
+        body = json.dumps({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps({"r": spans})},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# 백그라운드 스레드로 서버 시작 -> (서버, base_url), 끝나면 server.shutdown()
+def start_fake_llm(latency=0.0):
+    handler = type("Handler", (FakeLLMHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
@@ -0,0 +1,254 @@
+import io
+import os
+import json
+import random
+import struct
+import zlib
+import zipfile
+import argparse
+from xml.sax.saxutils import escape
+from openpyxl import Workbook
+from openpyxl.comments import Comment
+from openpyxl.drawing.image import Image as XLImage
+
+# 합성 데이터 -> 실제 개인정보 아님
+NAMES = ["홍길동", "김철수", "이영희", "박민수", "최지은", "정하늘", "강서준", "윤다은"]
+ADDRESSES = ["서울시 강남구 역삼동", "부산시 해운대구 우동", "대전시 유성구 봉명동", "인천시 연수구 송도동"]
+WORDS = ["회의", "자료", "검토", "프로젝트", "일정", "보고서", "예산", "담당자", "진행", "결과",
+         "요청", "확인", "계약", "고객", "변경", "지원", "분석", "the", "report", "status"]
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+EMU_PER_PX = 9525
+
+
+# 카테고리별 가짜 개인정보 값
+def fake_pii(rng):
+    category = rng.choice(["이름", "주소", "연락처", "주민등록번호", "이메일", "계좌번호", "카드번호", "생년월일", "여권번호"])
+    digits = lambda n: "".join(rng.choice("0123456789") for _ in range(n))
+    values = {
+        "이름": lambda: rng.choice(NAMES),
+        "주소": lambda: rng.choice(ADDRESSES),
+        "연락처": lambda: f"010-{digits(4)}-{digits(4)}",
+        "주민등록번호": lambda: f"{digits(6)}-{digits(7)}",
+        "이메일": lambda: f"user{digits(4)}@example.com",
+        "계좌번호": lambda: f"{digits(3)}-{digits(4)}-{digits(4)}",
+        "카드번호": lambda: f"{digits(4)}-{digits(4)}-{digits(4)}-{digits(4)}",
+        "생년월일": lambda: f"19{digits(2)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+        "여권번호": lambda: f"M{digits(8)}",
+    }
+    return category, values[category]()
+
+
+# 문장 하나 생성, pii_density 확률로 개인정보 포함
+def make_sentence(rng, pii_density, words=12):
+    tokens = [rng.choice(WORDS) for _ in range(words)]
+    if rng.random() < pii_density:
+        tokens.insert(rng.randrange(len(tokens) + 1), fake_pii(rng)[1])
+    return " ".join(tokens) + "."
+
+
+# 압축이 거의 안 되는 노이즈 png 생성 (이미지 용량 재현용)
+def make_png(rng, size_px):
+    raw = b"".join(b"\x00" + rng.randbytes(size_px * 3) for _ in range(size_px))
+    chunk = lambda tag, data: (struct.pack(">I", len(data)) + tag + data
+                               + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+    header = struct.pack(">IIBBBBB", size_px, size_px, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+# 텍스트를 run_chars 글자씩 w:r로 쪼갬 (0이면 문단당 run 하나)
+def runs_xml(text, run_chars):
+    if run_chars <= 0:
+        pieces = [text]
+    else:
+        pieces = [text[i:i + run_chars] for i in range(0, len(text), run_chars)]
+    return "".join(f'<w:r><w:t xml:space="preserve">{escape(piece)}</w:t></w:r>' for piece in pieces)
+
+
+def image_run_xml(image_id, size_px):
+    extent = size_px * EMU_PER_PX
+    return (
+        f'<w:r><w:drawing><wp:inline distT="0" distB="0" distL="0" distR="0">'
+        f'<wp:extent cx="{extent}" cy="{extent}"/><wp:docPr id="{image_id}" name="Picture {image_id}"/>'
+        f'<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<pic:pic><pic:nvPicPr><pic:cNvPr id="{image_id}" name="image{image_id}.png"/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip r:embed="rIdImage{image_id}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{extent}" cy="{extent}"/></a:xfrm>'
+        f'<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr></pic:pic>'
+        f'</a:graphicData></a:graphic></wp:inline></w:drawing></w:r>'
+    )
+
+
+# count개를 문단에 고르게 배치 -> 문단 번호별 개수 (문단보다 많으면 한 문단에 여러 개)
+def spread(count, paragraphs):
+    placed = [0] * paragraphs
+    for idx in range(count if paragraphs else 0):
+        placed[idx * paragraphs // count] += 1
+    return placed
+
+
+def table_xml(rng, rows, cols, pii_density, run_chars):
+    cells = lambda: "".join(
+        f'<w:tc><w:p>{runs_xml(make_sentence(rng, pii_density, words=3), run_chars)}</w:p></w:tc>'
+        for _ in range(cols))
+    return f'<w:tbl><w:tblPr><w:tblW w:w="0" w:type="auto"/></w:tblPr>{"".join(f"<w:tr>{cells()}</w:tr>" for _ in range(rows))}</w:tbl>'
+
+
+# 합성 Word 파일 생성 -> 파일 경로
+def generate_docx(path, paragraphs=1000, run_chars=0, pii_density=0.2, tables=0, table_rows=10,
+                  table_cols=4, header=True, comments=0, images=0, image_px=256, seed=0):
+    rng = random.Random(seed)
+    body = []
+    table_counts = spread(tables, paragraphs)
+    comment_counts = spread(comments, paragraphs)
+    image_counts = spread(images, paragraphs)
+    comment_xml, image_ids = [], []
+
+    for idx in range(paragraphs):
+        text = " ".join(make_sentence(rng, pii_density) for _ in range(3))
+        content = runs_xml(text, run_chars)
+        for _ in range(comment_counts[idx]):
+            cid = len(comment_xml)
+            comment_text = f"{rng.choice(NAMES)} 확인 필요: {fake_pii(rng)[1]}"
+            comment_xml.append(f'<w:comment w:id="{cid}" w:author="bench" w:initials="B">'
+                               f'<w:p>{runs_xml(comment_text, run_chars)}</w:p></w:comment>')
+            content = (f'<w:commentRangeStart w:id="{cid}"/>{content}<w:commentRangeEnd w:id="{cid}"/>'
+                       f'<w:r><w:commentReference w:id="{cid}"/></w:r>')
+        for _ in range(image_counts[idx]):
+            image_ids.append(len(image_ids) + 1)
+            content += image_run_xml(image_ids[-1], image_px)
+        body.append(f"<w:p>{content}</w:p>")
+        for _ in range(table_counts[idx]):
+            body.append(table_xml(rng, table_rows, table_cols, pii_density, run_chars))
+
+    sect = '<w:sectPr><w:headerReference w:type="default" r:id="rIdHeader"/></w:sectPr>' if header else "<w:sectPr/>"
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{W_NS}" xmlns:r="{R_NS}" '
+        f'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+        f'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+        f'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<w:body>{"".join(body)}{sect}</w:body></w:document>'
+    )
+
+    rels = [f'<Relationship Id="rIdImage{i}" Type="{REL_TYPE}/image" Target="media/image{i}.png"/>' for i in image_ids]
+    overrides = ['<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>']
+    if header:
+        rels.append(f'<Relationship Id="rIdHeader" Type="{REL_TYPE}/header" Target="header1.xml"/>')
+        overrides.append('<Override PartName="/word/header1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>')
+    if comment_xml:
+        rels.append(f'<Relationship Id="rIdComments" Type="{REL_TYPE}/comments" Target="comments.xml"/>')
+        overrides.append('<Override PartName="/word/comments.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.comments+xml"/>')
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                    '<Default Extension="xml" ContentType="application/xml"/>'
+                    '<Default Extension="png" ContentType="image/png"/>'
+                    f'{"".join(overrides)}</Types>')
+        zf.writestr("_rels/.rels",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    f'<Relationship Id="rId1" Type="{REL_TYPE}/officeDocument" Target="word/document.xml"/>'
+                    '</Relationships>')
+        zf.writestr("word/_rels/document.xml.rels",
+                    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    f'{"".join(rels)}</Relationships>')
+        zf.writestr("word/document.xml", document)
+        if header:
+            header_text = f"대외비 - 작성자 {rng.choice(NAMES)} {fake_pii(rng)[1]}"
+            zf.writestr("word/header1.xml",
+                        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        f'<w:hdr xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:p>{runs_xml(header_text, run_chars)}</w:p></w:hdr>')
+        if comment_xml:
+            zf.writestr("word/comments.xml",
+                        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        f'<w:comments xmlns:w="{W_NS}">{"".join(comment_xml)}</w:comments>')
+        for image_id in image_ids:
+            zf.writestr(f"word/media/image{image_id}.png", make_png(rng, image_px))
+    return path
+
+
+# 합성 Excel 파일 생성 -> 파일 경로
+def generate_xlsx(path, rows=1000, cols=8, sheets=1, pii_density=0.2, comments=0, images=0,
+                  image_px=256, seed=0):
+    rng = random.Random(seed)
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for sheet_idx in range(sheets):
+        worksheet = workbook.create_sheet(f"Sheet{sheet_idx + 1}")
+        worksheet.append([f"항목{col + 1}" for col in range(cols)])
+        for _ in range(rows):
+            worksheet.append([make_sentence(rng, pii_density, words=3) for _ in range(cols)])
+        # 같은 셀에 메모가 덮어써지지 않게 서로 다른 셀 선택 (셀 수보다 많으면 셀 수까지)
+        for position in rng.sample(range(rows * cols), min(comments, rows * cols)):
+            cell = worksheet.cell(row=position // cols + 2, column=position % cols + 1)
+            cell.comment = Comment(f"{rng.choice(NAMES)} 확인 필요: {fake_pii(rng)[1]}", "bench")
+        with_images = images // sheets + (1 if sheet_idx < images % sheets else 0)
+        for idx in range(with_images):
+            image = XLImage(io.BytesIO(make_png(rng, image_px)))
+            worksheet.add_image(image, f"{chr(ord('A') + cols + 1)}{idx * 20 + 1}")
+    workbook.save(path)
+    return path
+
+
+# 설정별 파일 묶음 생성 -> 생성된 파일 경로 목록
+def generate_corpus(out_dir, docx_options=None, xlsx_options=None):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    if docx_options is not None:
+        paths.append(generate_docx(os.path.join(out_dir, "synthetic.docx"), **docx_options))
+    if xlsx_options is not None:
+        paths.append(generate_xlsx(os.path.join(out_dir, "synthetic.xlsx"), **xlsx_options))
+    return paths
+
+
+def add_corpus_arguments(parser):
+    parser.add_argument("--paragraphs", type=int, default=2000, help="docx 문단 수")
+    parser.add_argument("--run-chars", type=int, default=0, help="run 하나당 글자 수 (0 = 문단당 run 하나)")
+    parser.add_argument("--pii-density", type=float, default=0.2, help="문장에 개인정보가 들어갈 확률")
+    parser.add_argument("--tables", type=int, default=5, help="docx 표 개수")
+    parser.add_argument("--no-header", action="store_true", help="docx 머리글 생략")
+    parser.add_argument("--comments", type=int, default=20, help="메모 개수")
+    parser.add_argument("--images", type=int, default=2, help="삽입 이미지 개수")
+    parser.add_argument("--image-px", type=int, default=256, help="이미지 한 변 픽셀 수")
+    parser.add_argument("--xlsx-rows", type=int, default=2000, help="xlsx 시트당 행 수")
+    parser.add_argument("--xlsx-cols", type=int, default=8, help="xlsx 열 수")
+    parser.add_argument("--sheets", type=int, default=1, help="xlsx 시트 수")
+    parser.add_argument("--only", choices=["docx", "xlsx"], help="한 형식만 생성")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+# argparse 결과 -> generate_corpus 옵션
+def corpus_options(args):
+    docx_options = {
+        "paragraphs": args.paragraphs, "run_chars": args.run_chars, "pii_density": args.pii_density,
+        "tables": args.tables, "header": not args.no_header, "comments": args.comments,
+        "images": args.images, "image_px": args.image_px, "seed": args.seed,
+    }
+    xlsx_options = {
+        "rows": args.xlsx_rows, "cols": args.xlsx_cols, "sheets": args.sheets, "pii_density": args.pii_density,
+        "comments": args.comments, "images": args.images, "image_px": args.image_px, "seed": args.seed,
+    }
+    return {
+        "docx_options": None if args.only == "xlsx" else docx_options,
+        "xlsx_options": None if args.only == "docx" else xlsx_options,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="마스킹 벤치마크용 합성 docx/xlsx 생성")
+    parser.add_argument("out_dir")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+
+    options = corpus_options(args)
+    for path in generate_corpus(args.out_dir, **options):
+        print(f"{path} ({os.path.getsize(path) / 1024 / 1024:.2f} MB)")
+    print(json.dumps(options, ensure_ascii=False))
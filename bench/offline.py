@@ -0,0 +1,24 @@
+import openai
+import pymongo
+
+# masking_main은 임포트할 때 몽고디비 접속과 openai 클라이언트 생성을 함
+# -> 벤치마크는 네트워크/키 없이 돌아야 하므로 masking_main보다 먼저 임포트해서 둘 다 대체
+
+
+# 디비를 쓰지 않는 벤치마크용 MongoClient, client[db][collection] 접근만 지원
+class OfflineMongoClient:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getitem__(self, name):
+        return OfflineMongoClient()
+
+
+# 빈 api_key를 거부하는 openai 버전 대비 -> 실제 요청은 벤치마크가 가짜 엔드포인트 클라이언트로 교체
+class OfflineOpenAI(openai.OpenAI):
+    def __init__(self, *args, api_key=None, **kwargs):
+        super().__init__(*args, api_key=api_key or "bench", **kwargs)
+
+
+pymongo.MongoClient = OfflineMongoClient
+openai.OpenAI = OfflineOpenAI
@@ -0,0 +1,287 @@
+import os
+import sys
+import json
+import time
+import pickle
+import shutil
+import zipfile
+import platform
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from tempfile import TemporaryDirectory
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import openai
+import offline  # masking_main 임포트 전에 몽고디비/openai 키 대체
+import masking_main
+from fake_llm import start_fake_llm
+from generate_corpus import generate_corpus, add_corpus_arguments, corpus_options
+
+HISTORY_PATH = os.path.join(BENCH_DIR, "results.jsonl")
+STAGES = ["extract", "regex", "llm", "apply_masking", "process_xml", "zip_rewrite"]
+TEXT_STAGES = {"regex", "llm", "apply_masking"}  # 처리량을 파일 크기가 아닌 추출 텍스트 크기로 계산
+
+
+# 현재 커밋 (작업 중 변경이 있으면 -dirty)
+def git_revision():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True).strip()
+        dirty = subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                        cwd=REPO_DIR, text=True).strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# 프로세스 최대 메모리(MB), resource 모듈이 없는 윈도우에서는 None
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+# 리눅스 /proc 기준 현재 RSS와 최대 RSS(MB), 최대값은 reset_peak_rss()로 초기화 가능 -> 없으면 None
+def proc_rss_mb():
+    try:
+        with open("/proc/self/status") as file:
+            status = dict(line.split(":", 1) for line in file if ":" in line)
+        return int(status["VmRSS"].split()[0]) / 1024, int(status["VmHWM"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# 단계 이름 -> (실행 함수, 매 실행 전 준비 함수 또는 None), inputs는 앞 단계 결과를 담은 dict
+def make_stage(stage, inputs):
+    if stage == "extract":
+        extract = masking_main.extract_text_from_word if inputs["is_word"] else masking_main.extract_text_from_excel
+        return lambda: extract(inputs["file_path"]), None
+    if stage == "regex":
+        return lambda: masking_main.detect_pii_with_regex(inputs["content"], list(masking_main.patterns)), None
+    if stage == "llm":
+        return lambda: masking_main.detect_sensitive_info_with_chatgpt(inputs["content"], ["이름"], []), None
+    if stage == "apply_masking":
+        return lambda: masking_main.apply_masking(inputs["content"], inputs["masking_data"]), None
+    if stage == "process_xml":
+        # 원본 document.xml을 매번 새로 복사해서 마스킹
+        def fresh_document_xml():
+            target = os.path.join(inputs["unpacked_dir"], "word", "document.xml")
+            shutil.copyfile(inputs["original_xml"], target)
+            return (target,)
+        return lambda path: masking_main.process_xml_file(path, inputs["masking_data"]), fresh_document_xml
+    if stage == "zip_rewrite":
+        return lambda: masking_main.zip_directory(inputs["unpacked_dir"], inputs["zip_path"]), None
+    raise ValueError(f"unknown stage: {stage}")
+
+
+# 단계 하나를 새 프로세스에서 실행 -> RSS 증가분(MB), tracemalloc이 못 보는 lxml/zlib 등 C 할당 포함
+# 병렬 스캔 워커 같은 자식 프로세스 메모리는 포함하지 않음
+def stage_rss(stage, inputs_path):
+    if max_rss_mb() is None:
+        return None
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--rss-stage", stage, inputs_path],
+                                     text=True)
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["rss_mb"]
+
+
+# --rss-stage 자식 프로세스 -> 단계 실행 중 최대 RSS가 실행 직전 RSS보다 얼마나 늘었는지 출력
+# 리눅스는 최대 RSS를 초기화해서 정확히 측정, 그 외에는 ru_maxrss 증가분이라 임포트 시 최대값보다 작으면 0
+def run_rss_stage(stage, inputs_path):
+    with open(inputs_path, "rb") as file:
+        inputs = pickle.load(file)
+    masking_main.client = openai.OpenAI(api_key="bench", base_url=inputs["base_url"])
+    func, setup = make_stage(stage, inputs)
+    args = setup() if setup else ()
+
+    use_proc = proc_rss_mb() is not None and reset_peak_rss()
+    before = proc_rss_mb()[0] if use_proc else max_rss_mb()
+    func(*args)
+    after = proc_rss_mb()[1] if use_proc else max_rss_mb()
+    print(json.dumps({"rss_mb": max(after - before, 0.0)}))
+
+
+# 단계 하나 측정 -> 반복 실행 중앙값(초)과 파이썬 힙 최대 사용량(MB, tracemalloc 기준)
+# setup은 매 실행 전에 호출되고 측정 시간에는 포함되지 않음
+def measure(func, setup, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+
+    # 메모리는 별도 1회 실행 (tracemalloc 오버헤드가 시간 측정에 섞이지 않게)
+    args = setup() if setup else ()
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, {"seconds": statistics.median(timings), "py_heap_mb": peak / 1024 / 1024}
+
+
+# 파일 하나에 대해 파이프라인 단계별 측정
+def bench_file(file_path, repeat, work_dir, base_url):
+    inputs = {"file_path": file_path, "is_word": file_path.endswith(".docx"), "base_url": base_url}
+    input_bytes = os.path.getsize(file_path)
+    stages = {}
+
+    inputs["content"], stages["extract"] = measure(*make_stage("extract", inputs), repeat)
+    regex_results, stages["regex"] = measure(*make_stage("regex", inputs), repeat)
+    llm_response, stages["llm"] = measure(*make_stage("llm", inputs), repeat)
+
+    masking_data = set()
+    for values in masking_main.merge_results(regex_results, llm_response["개인정보"]).values():
+        masking_data.update(values)
+    inputs["masking_data"] = masking_data
+    _, stages["apply_masking"] = measure(*make_stage("apply_masking", inputs), repeat)
+
+    output_bytes = None
+    if inputs["is_word"]:
+        inputs["unpacked_dir"] = os.path.join(work_dir, "unpacked")
+        with zipfile.ZipFile(file_path) as zip_ref:
+            zip_ref.extractall(inputs["unpacked_dir"])
+        inputs["original_xml"] = os.path.join(work_dir, "document.xml")
+        shutil.copyfile(os.path.join(inputs["unpacked_dir"], "word", "document.xml"), inputs["original_xml"])
+        inputs["zip_path"] = os.path.join(work_dir, "rewrite.docx")
+
+        _, stages["process_xml"] = measure(*make_stage("process_xml", inputs), repeat)
+        _, stages["zip_rewrite"] = measure(*make_stage("zip_rewrite", inputs), repeat)
+
+        masked_path = masking_main.write_masked_docx(file_path, masking_data, output_dir=work_dir)
+        output_bytes = os.path.getsize(masked_path)
+
+    inputs_path = os.path.join(work_dir, "inputs.pkl")
+    with open(inputs_path, "wb") as file:
+        pickle.dump(inputs, file)
+    text_bytes = len(inputs["content"].encode("utf-8"))
+    for stage, stats in stages.items():
+        size = text_bytes if stage in TEXT_STAGES else input_bytes
+        stats["mb_per_s"] = size / 1024 / 1024 / stats["seconds"] if stats["seconds"] else None
+        stats["rss_mb"] = stage_rss(stage, inputs_path)
+
+    return {
+        "input_bytes": input_bytes,
+        "text_chars": len(inputs["content"]),
+        "text_bytes": text_bytes,
+        "masking_values": len(masking_data),
+        "output_bytes": output_bytes,
+        "size_ratio": output_bytes / input_bytes if output_bytes else None,
+        "stages": stages,
+    }
+
+
+# 파일별로 같은 생성 옵션/지연 설정으로 측정한 직전 기록 -> {파일명: (커밋, 결과)}
+def previous_results(history_path, files, llm_latency):
+    previous = {}
+    if not os.path.exists(history_path):
+        return previous
+    with open(history_path, encoding="utf-8") as file:
+        for line in file:
+            record = json.loads(line)
+            if record.get("llm_latency") != llm_latency:
+                continue
+            for name, result in record["files"].items():
+                if name in files and result.get("options") == files[name]["options"]:
+                    previous[name] = (record["commit"], result)
+    return previous
+
+
+def print_report(record, previous):
+    print(f"commit {record['commit']}  python {record['python']}  max rss {record['max_rss_mb'] or 0:.1f} MB")
+    for name, result in record["files"].items():
+        ratio = f"{result['size_ratio']:.2f}x" if result["size_ratio"] else "-"
+        print(f"\n{name}: 입력 {result['input_bytes'] / 1024 / 1024:.2f} MB, "
+              f"텍스트 {result['text_chars']}자, 출력/입력 {ratio}")
+        previous_stages = {}
+        if name in previous:
+            previous_commit, previous_result = previous[name]
+            previous_stages = previous_result["stages"]
+            print(f"  비교 대상: {previous_commit}")
+        print(f"  {'stage':<14}{'seconds':>10}{'MB/s':>10}{'rss MB':>10}{'py heap MB':>12}{'vs prev':>10}")
+        for stage in STAGES:
+            stats = result["stages"].get(stage)
+            if not stats:
+                continue
+            delta = ""
+            if stage in previous_stages and previous_stages[stage]["seconds"]:
+                delta = f"{(stats['seconds'] / previous_stages[stage]['seconds'] - 1) * 100:+.1f}%"
+            print(f"  {stage:<14}{stats['seconds']:>10.4f}{stats['mb_per_s'] or 0:>10.2f}"
+                  f"{format_mb(stats['rss_mb']):>10}"
+                  f"{stats['py_heap_mb']:>12.2f}{delta:>10}")
+    print("\nMB/s: regex/llm/apply_masking은 추출 텍스트(utf-8) 크기, 나머지는 입력 파일 크기 기준")
+    print("rss MB: 단계를 새 프로세스에서 실행했을 때 실행 직전 대비 최대 RSS 증가분 (자식 프로세스 제외)")
+    print("py heap MB: tracemalloc 기준 파이썬 힙 최대 사용량 (C 확장 할당, 자식 프로세스 제외)")
+
+
+def format_mb(value):
+    return "-" if value is None else f"{value:.2f}"
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--rss-stage":
+        run_rss_stage(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description="마스킹 파이프라인 벤치마크 (가짜 LLM 엔드포인트 사용)")
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3, help="단계별 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="가짜 LLM 응답 지연(초)")
+    parser.add_argument("--history", default=HISTORY_PATH, help="결과를 누적 기록할 jsonl 경로")
+    parser.add_argument("--no-save", action="store_true", help="결과를 기록하지 않음")
+    args = parser.parse_args()
+
+    corpus = corpus_options(args)
+    server, base_url = start_fake_llm(args.llm_latency)
+    masking_main.client = openai.OpenAI(api_key="bench", base_url=base_url)
+    try:
+        with TemporaryDirectory() as work_dir:
+            files = {}
+            for path in generate_corpus(os.path.join(work_dir, "corpus"), **corpus):
+                name = os.path.basename(path)
+                file_dir = os.path.join(work_dir, name + ".work")
+                os.makedirs(file_dir)
+                files[name] = bench_file(path, args.repeat, file_dir, base_url)
+                files[name]["options"] = corpus["docx_options" if name.endswith(".docx") else "xlsx_options"]
+    finally:
+        server.shutdown()
+
+    record = {
+        "commit": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": corpus,
+        "repeat": args.repeat,
+        "llm_latency": args.llm_latency,
+        "max_rss_mb": max_rss_mb(),
+        "files": files,
+    }
+    print_report(record, previous_results(args.history, files, args.llm_latency))
+
+    if not args.no_save:
+        with open(args.history, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"\n결과 저장: {args.history}")
+
+
+if __name__ == "__main__":
+    main()
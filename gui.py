@@ -1,20 +1,14 @@
 import os
 import json
+import multiprocessing
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from ttkbootstrap import Style
-from masking_main import main as masking_main_function  # 직접 import로 변경 -> 서비스 연결
 
 # 업로드 및 마스킹 파일 저장 폴더 설정
 UPLOAD_DIR = "uploads"
 MASKED_DIR = "masked_files"
 
-if not os.path.exists(UPLOAD_DIR):
-    os.makedirs(UPLOAD_DIR)
-
-if not os.path.exists(MASKED_DIR):
-    os.makedirs(MASKED_DIR)
-
 class SMOCookieApp:
     def __init__(self):
         self.root = tk.Tk()
@@ -103,6 +97,8 @@ class SMOCookieApp:
 
         try:
             # masking_main의 main 함수 호출
+            # 모듈 임포트 시 몽고디비/openai 클라이언트가 생성되므로 여기서 임포트 -> 병렬 스캔 워커(spawn)는 만들지 않음
+            from masking_main import main as masking_main_function
             masked_file = masking_main_function(
                 self.selected_file,
                 "word" if self.selected_file.endswith(".docx") else "excel",
@@ -126,5 +122,13 @@ class SMOCookieApp:
             messagebox.showerror("Error", f"Failed to execute masking: {e}")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # exe(PyInstaller)에서 병렬 스캔 프로세스 풀 사용
+
+    if not os.path.exists(UPLOAD_DIR):
+        os.makedirs(UPLOAD_DIR)
+
+    if not os.path.exists(MASKED_DIR):
+        os.makedirs(MASKED_DIR)
+
     app = SMOCookieApp()
     app.root.mainloop()
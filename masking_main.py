@@ -1,6 +1,8 @@
 import os
 import json
 import re
+import time
+import random
 import openai
 import zipfile
 from pymongo import MongoClient
@@ -8,6 +10,7 @@ from docx import Document
 from openpyxl import load_workbook
 from tempfile import TemporaryDirectory
 from lxml import etree
+from parallel_scan import scan_text
 
 # openai api
 client = openai.OpenAI(api_key="")
@@ -37,51 +40,233 @@ patterns = {
 
 # 정규표현식 기반 탐지
 def detect_pii_with_regex(content, selected_types):
-    results = {}
-    for key, pattern in patterns.items():
-        if key in selected_types:
-            matches = re.findall(pattern, content)
-            if matches:
-                results[key] = list(set(matches))  # 중복 제거
-    return results
-
-# open ai 기반탐지
-def detect_sensitive_info_with_chatgpt(content, selected_types, additional_info):
+    return detect_local(content, selected_types, [])[0]
+
+# 정규표현식 + 문자열 탐지를 한 번의 스캔으로 처리 (큰 텍스트는 청크 단위 병렬 스캔)
+def detect_local(content, selected_types, literals):
+    local_patterns = {("regex", key): pattern for key, pattern in patterns.items() if key in selected_types}
+    local_patterns.update({("literal", literal): re.escape(literal) for literal in literals if literal})
+    found = scan_text(content, local_patterns)  # 중복 제거된 값
+
+    regex_results, literal_results = {}, {}
+    for (kind, key), values in found.items():
+        (regex_results if kind == "regex" else literal_results)[key] = values
+    return regex_results, literal_results
+
+# 항목별 탐지 결과 통합 (중복 제거, 순서 유지 -> dict 키로 처리해서 값이 많아도 선형 시간)
+def merge_results(*results_list):
+    merged = {}
+    for results in results_list:
+        for key, values in results.items():
+            merged.setdefault(key, {}).update(dict.fromkeys(values))
+    return {key: list(values) for key, values in merged.items()}
+
+# open ai 기반탐지 설정
+LLM_MODEL = "gpt-4o"  # json 모드 지원 모델
+LLM_CHUNK_CHARS = 6000  # 요청 한 번에 보낼 문단 글자 수
+LLM_CHUNK_RETRIES = 2  # 실패한 청크만 다시 요청하는 횟수 (타임아웃, 파싱 실패)
+LLM_MIN_VALUE_CHARS = 2  # 이보다 짧은 값은 마스킹하지 않음 (한 글자/공백이 문서 전체에서 치환되는 것 방지)
+LLM_FILE_BUDGET = 60.0  # 파일 하나당 llm 탐지에 쓸 수 있는 시간(초)
+LLM_REQUEST_TIMEOUT = 20.0  # 요청 하나당 타임아웃(초)
+LLM_BACKOFF_BASE = 0.5  # 재시도 대기 기본값(초), 시도마다 2배 + 지터
+BREAKER_THRESHOLD = 3  # 연속 실패 시 차단 횟수
+BREAKER_COOLDOWN = 60.0  # 차단 후 다시 요청해볼 때까지 대기(초)
+# 재시도하면 성공할 수 있는 오류 (타임아웃, 연결 실패, 429, 5xx) -> 인증/잘못된 요청 등은 바로 실패
+RETRYABLE_LLM_ERRORS = (openai.APITimeoutError, openai.APIConnectionError,
+                        openai.RateLimitError, openai.InternalServerError)
+SPAN_PATTERN = re.compile(r"\[\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\]")
+WORD_PATTERN = re.compile(r"\w(?:\S*\w)?")  # 공백 기준 단어, 앞뒤 문장부호는 제외
+
+# 텍스트를 문단 id -> 문단 텍스트로 분리 (빈 줄 제외)
+def split_paragraphs(content):
+    return {pid: text for pid, text in enumerate(content.split("\n")) if text.strip()}
+
+# 문단 -> 단어 (start, end) 위치 목록, 모델에는 단어 번호만 받아서 글자 위치를 세지 않게 함
+def split_words(paragraph):
+    return [match.span() for match in WORD_PATTERN.finditer(paragraph)]
+
+# 문단 id를 글자 수 기준으로 청크 단위로 묶음
+def chunk_paragraphs(paragraphs, max_chars=LLM_CHUNK_CHARS):
+    chunk, size = [], 0
+    for pid, text in paragraphs.items():
+        if chunk and size + len(text) > max_chars:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(pid)
+        size += len(text)
+    if chunk:
+        yield chunk
+
+# 서킷 브레이커 -> 연속으로 실패하는 엔드포인트에는 한동안 요청하지 않음
+llm_breaker = {"failures": 0, "open_until": 0.0}
+
+def breaker_allows_request():
+    return time.monotonic() >= llm_breaker["open_until"]
+
+def record_llm_success():
+    llm_breaker["failures"] = 0
+
+def record_llm_failure():
+    llm_breaker["failures"] += 1
+    if llm_breaker["failures"] >= BREAKER_THRESHOLD:
+        llm_breaker["open_until"] = time.monotonic() + BREAKER_COOLDOWN
+
+# 키/권한 오류는 다른 청크도 똑같이 실패 -> 바로 차단해서 남은 청크는 요청 없이 실패 처리
+def trip_llm_breaker():
+    llm_breaker["failures"] = BREAKER_THRESHOLD
+    llm_breaker["open_until"] = time.monotonic() + BREAKER_COOLDOWN
+
+# 응답 파싱 -> [id, 첫 단어, 끝 단어, 카테고리번호] 목록, json이 아니거나 "r" 목록이 없으면 None
+def parse_llm_spans(raw, words, chunk, category_count):
+    try:
+        data = json.loads(raw)
+    except (TypeError, json.JSONDecodeError):
+        return None
+    rows = data.get("r") if isinstance(data, dict) else None
+    if not isinstance(rows, list):
+        return None
+    return valid_spans(rows, words, chunk, category_count)
+
+# 잘리거나 깨진 응답에서 형식이 맞는 항목만 추려냄 -> 불완전한 결과라 청크는 실패로 처리
+def rescue_llm_spans(raw, words, chunk, category_count):
+    rows = [list(map(int, match)) for match in SPAN_PATTERN.findall(raw or "")]
+    return valid_spans(rows, words, chunk, category_count)
+
+# 문단/단어 번호/카테고리 범위를 벗어난 항목 제외
+def valid_spans(rows, words, chunk, category_count):
+    spans = []
+    for row in rows:
+        if not (isinstance(row, list) and len(row) == 4 and all(isinstance(v, int) for v in row)):
+            continue
+        pid, first, last, category = row
+        if pid not in chunk or not 0 <= category < category_count:
+            continue
+        if 0 <= first <= last < len(words[pid]):
+            spans.append((pid, first, last, category))
+    return spans
+
+# 단어 번호 -> 마스킹할 값 (원문 그대로, 너무 짧으면 None)
+def span_value(paragraph, paragraph_words, first, last):
+    value = paragraph[paragraph_words[first][0]:paragraph_words[last][1]]
+    return value if len(value) >= LLM_MIN_VALUE_CHARS else None
+
+# 청크 하나를 요청 -> (원본 응답 문자열, 토큰 한도로 잘렸는지)
+def request_llm_spans(chunk, paragraphs, words, categories, timeout=LLM_REQUEST_TIMEOUT):
+    category_lines = "\n".join(f"{idx}={name}" for idx, name in enumerate(categories))
+    paragraph_lines = "\n".join(
+        f"{pid}\t" + " ".join(f"{idx}|{paragraphs[pid][start:end]}" for idx, (start, end) in enumerate(words[pid]))
+        for pid in chunk
+    )
     prompt = f"""
-    다음 텍스트에서 다음 항목을 문맥을 분석하여 탐지하세요:
-    - 선택된 개인정보: {selected_types}
-    - 추가 요청 정보: {additional_info}
-    
+    다음 문단들에서 아래 카테고리에 해당하는 값을 문맥을 분석하여 탐지하세요.
+    각 줄은 "문단id<탭>단어번호|단어 단어번호|단어 ..." 형식입니다.
+    탐지한 값은 다시 쓰지 말고 값이 시작하는 단어 번호와 끝나는 단어 번호만 반환하세요. (둘 다 포함, 한 단어면 같은 번호)
+
+    **카테고리:**
+    {category_lines}
+
     **반환 형식(JSON):**
-    {{
-        "개인정보": {{
-            "이름": ["홍길동", "김철수"],
-            "주소": ["서울시 강남구 역삼동"]
-        }},
-        "추가 탐지 정보": {{
-            "추가 요청 정보": ["Project Alpha", "XYZ Corporation"]
-        }}
-    }}
-
-    **분석할 텍스트:**
-    {content}
+    {{"r": [[문단id, 첫 단어번호, 끝 단어번호, 카테고리번호], ...]}}
+    탐지된 값이 없으면 {{"r": []}}
+
+    **분석할 문단:**
+    {paragraph_lines}
     """
 
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = client.with_options(timeout=timeout, max_retries=0).chat.completions.create(
+        model=LLM_MODEL,
         messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+        temperature=0,
     )
-
-    try:
-        return json.loads(response.choices[0].message.content)
-    except json.JSONDecodeError:
-        return {"error": "Invalid JSON from ChatGPT"}
-
-# 디비에 탐지된 정보 저장
-def save_to_mongodb(file_name, detected_info, additional_results):
-    file_metadata_collection.insert_one({"file_name": file_name})
-    detected_info_collection.insert_one({"file_name": file_name, "detected_info": detected_info})
-    additional_info_collection.insert_one({"file_name": file_name, "additional_info": additional_results})
+    choice = response.choices[0]
+    return choice.message.content, choice.finish_reason == "length"
+
+# 청크 하나 탐지 -> (스팬 목록, 상태)
+# 상태: "ok" 완료, "truncated" 응답이 잘림, "failed" 시간 초과/차단/재시도 소진 (둘 다 추려낸 스팬만 반환)
+def detect_chunk_spans(chunk, paragraphs, words, categories, deadline):
+    rescued = []
+    for attempt in range(1 + LLM_CHUNK_RETRIES):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not breaker_allows_request():
+            return rescued, "failed"
+        try:
+            raw, truncated = request_llm_spans(chunk, paragraphs, words, categories,
+                                               min(LLM_REQUEST_TIMEOUT, remaining))
+        except RETRYABLE_LLM_ERRORS as e:
+            print("ChatGPT 요청 실패:", e)
+            record_llm_failure()
+            if attempt < LLM_CHUNK_RETRIES:
+                # 지터를 준 지수 백오프, 남은 예산을 넘지 않게
+                backoff = random.uniform(0, LLM_BACKOFF_BASE * 2 ** attempt)
+                time.sleep(max(0.0, min(backoff, deadline - time.monotonic())))
+            continue
+        except (openai.AuthenticationError, openai.PermissionDeniedError) as e:
+            print("ChatGPT 인증 실패 (남은 요청 중단):", e)
+            trip_llm_breaker()
+            return rescued, "failed"
+        except openai.OpenAIError as e:
+            print("ChatGPT 요청 실패 (재시도 안 함):", e)
+            return rescued, "failed"
+        record_llm_success()
+        if truncated:
+            return rescue_llm_spans(raw, words, chunk, len(categories)), "truncated"
+        # 파싱 실패한 청크는 해당 청크만 개별 재요청
+        chunk_spans = parse_llm_spans(raw, words, chunk, len(categories))
+        if chunk_spans is not None:
+            return chunk_spans, "ok"
+        rescued = rescue_llm_spans(raw, words, chunk, len(categories)) or rescued
+    return rescued, "failed"
+
+# open ai 기반탐지 -> 예산 안에 끝난 청크 결과만 반환, 빠진 청크가 있으면 partial
+def detect_sensitive_info_with_chatgpt(content, selected_types, additional_info, budget=LLM_FILE_BUDGET):
+    paragraphs = split_paragraphs(content)
+    categories = list(selected_types) + list(additional_info)
+    if not paragraphs or not categories:
+        return {"개인정보": {}, "추가 탐지 정보": {}, "partial": False}
+
+    words = {pid: split_words(text) for pid, text in paragraphs.items()}
+    deadline = time.monotonic() + budget
+    pending = list(chunk_paragraphs(paragraphs))
+    spans, failed = [], 0
+    while pending:
+        chunk = pending.pop(0)
+        chunk_spans, status = detect_chunk_spans(chunk, paragraphs, words, categories, deadline)
+        if status == "truncated" and len(chunk) > 1:
+            # 응답이 잘린 청크는 반으로 나눠 다시 요청
+            half = len(chunk) // 2
+            pending[:0] = [chunk[:half], chunk[half:]]
+            continue
+        # 잘리거나 실패한 청크에서 추려낸 값도 마스킹에는 쓰되 파일은 partial로 남김
+        spans.extend(chunk_spans)
+        if status != "ok":
+            failed += 1
+
+    if failed:
+        print(f"ChatGPT 탐지 미완료 청크 {failed}개 -> 부분 결과 사용")
+
+    # 단어 번호 -> 실제 값으로 변환해서 마스킹 데이터로 사용
+    personal_info, additional_results = {}, {}
+    for pid, first, last, category in spans:
+        name = categories[category]
+        target = personal_info if category < len(selected_types) else additional_results
+        value = span_value(paragraphs[pid], words[pid], first, last)
+        if value is None:
+            continue
+        target.setdefault(name, {})[value] = None  # 중복 제거
+
+    return {
+        "개인정보": {name: list(values) for name, values in personal_info.items()},
+        "추가 탐지 정보": {name: list(values) for name, values in additional_results.items()},
+        "partial": failed > 0,
+    }
+
+# 디비에 탐지된 정보 저장 -> 파일당 문서 하나, 재처리하면 최신 결과로 교체
+def save_to_mongodb(file_name, detected_info, additional_results, status="complete"):
+    key = {"file_name": file_name}
+    file_metadata_collection.replace_one(key, {**key, "status": status}, upsert=True)  # partial -> 재처리 대상
+    detected_info_collection.replace_one(key, {**key, "detected_info": detected_info}, upsert=True)
+    additional_info_collection.replace_one(key, {**key, "additional_info": additional_results}, upsert=True)
 
 # 마스킹 데이터 가져오기
 def get_masking_data_from_mongodb(file_name):
@@ -93,7 +278,8 @@ def get_masking_data_from_mongodb(file_name):
 
     additional_info = additional_info_collection.find_one({"file_name": file_name})
     if additional_info and "additional_info" in additional_info:
-        masking_data.update(additional_info["additional_info"])
+        for values in additional_info["additional_info"].values():
+            masking_data.update(values)
 
     return masking_data
 
@@ -131,13 +317,17 @@ def process_xml_file(xml_path, masking_data):
     with open(xml_path, 'wb') as file:
         file.write(etree.tostring(xml_tree, pretty_print=True))
 
-# Word 파일 마스킹
-def mask_sensitive_data_with_images(file_path):
-    masking_data = get_masking_data_from_mongodb(file_path)
-    if not masking_data:
-        print("No data to mask")
-        return None
-
+# 압축 해제된 디렉토리를 다시 zip(docx)으로 압축
+def zip_directory(src_dir, zip_path):
+    with zipfile.ZipFile(zip_path, 'w') as zip_out:
+        for foldername, subfolders, filenames in os.walk(src_dir):
+            for filename in filenames:
+                file_path = os.path.join(foldername, filename)
+                arcname = os.path.relpath(file_path, src_dir)
+                zip_out.write(file_path, arcname)
+
+# Word 파일에 마스킹 데이터 적용 -> 마스킹된 파일 경로
+def write_masked_docx(file_path, masking_data, output_dir=MASKED_DIR):
     with TemporaryDirectory() as temp_dir:
         with zipfile.ZipFile(file_path, 'r') as zip_ref:
             zip_ref.extractall(temp_dir)
@@ -147,14 +337,19 @@ def mask_sensitive_data_with_images(file_path):
             process_xml_file(document_xml_path, masking_data)
 
         file_name = os.path.basename(file_path).replace(".docx", "(masked).docx")
-        masked_file_path = os.path.join(MASKED_DIR, file_name)
-        with zipfile.ZipFile(masked_file_path, 'w') as zip_out:
-            for foldername, subfolders, filenames in os.walk(temp_dir):
-                for filename in filenames:
-                    file_path = os.path.join(foldername, filename)
-                    arcname = os.path.relpath(file_path, temp_dir)
-                    zip_out.write(file_path, arcname)
+        masked_file_path = os.path.join(output_dir, file_name)
+        zip_directory(temp_dir, masked_file_path)
+
+    return masked_file_path
+
+# Word 파일 마스킹
+def mask_sensitive_data_with_images(file_path):
+    masking_data = get_masking_data_from_mongodb(file_path)
+    if not masking_data:
+        print("No data to mask")
+        return None
 
+    masked_file_path = write_masked_docx(file_path, masking_data)
     return masked_file_path if os.path.exists(masked_file_path) else None
 
 # main
@@ -171,16 +366,17 @@ def main(file_path, file_type, selected_types_json, additional_info_json):
         print("지원하지 않는 파일 형식입니다.")
         return None
 
-    regex_results = detect_pii_with_regex(content, selected_types)
+    # 정규표현식, 문자열 탐지는 llm 상태와 상관없이 항상 적용
+    regex_results, literal_results = detect_local(content, selected_types, additional_info)
     chatgpt_response = detect_sensitive_info_with_chatgpt(content, selected_types, additional_info)
 
-    if "error" in chatgpt_response:
-        print("ChatGPT 탐지 중 오류 발생:", chatgpt_response["error"])
-        return None
-
-    final_results = {**regex_results, **chatgpt_response.get("개인정보", {})}
+    final_results = merge_results(regex_results, chatgpt_response["개인정보"])
+    additional_results = merge_results(literal_results, chatgpt_response["추가 탐지 정보"])
+    status = "partial" if chatgpt_response["partial"] else "complete"
+    if status == "partial":
+        print("ChatGPT 탐지가 일부만 완료되어 partial로 저장합니다.")
 
-    save_to_mongodb(file_path, final_results, chatgpt_response.get("추가 탐지 정보", {}))
+    save_to_mongodb(file_path, final_results, additional_results, status)
 
     masked_file = mask_sensitive_data_with_images(file_path)
 
@@ -0,0 +1,91 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+# 병렬 스캔 설정 -> 작은 텍스트는 프로세스 풀 비용이 더 커서 그냥 한 번에 스캔
+PARALLEL_SCAN_MIN_BYTES = 8 * 1024 * 1024
+SCAN_CHUNK_BYTES = 4 * 1024 * 1024
+MAX_MATCH_CHARS = 512  # 길이 제한이 없는 패턴(이메일 등)도 이보다 긴 값은 없다고 가정
+
+# 워커 프로세스 전역 (initializer에서 설정)
+worker_buffer = None
+worker_patterns = None
+
+
+# 패턴 키별로 찾은 값 모으기, limit 이전에서 시작한 매치만 인정
+def find_matches(text, compiled_patterns, limit=None):
+    results = {}
+    for key, regex in compiled_patterns.items():
+        found = results.setdefault(key, set())
+        for match in regex.finditer(text):
+            if limit is not None and match.start() >= limit:
+                break
+            found.add(match.group())
+    return results
+
+
+# 워커 초기화 -> 공유 메모리에 붙기만 하고 텍스트는 복사하지 않음
+def init_worker(shm_name, patterns):
+    global worker_buffer, worker_patterns
+    # 해제(unlink)는 부모 프로세스가 담당
+    worker_buffer = shared_memory.SharedMemory(name=shm_name)
+    worker_patterns = {key: re.compile(pattern) for key, pattern in patterns.items()}
+
+
+# 청크 하나 스캔 -> [start, end) 구간에서 시작한 매치만 반환 (겹침 구간은 다음 청크 담당)
+def scan_chunk(bounds):
+    start, end, window_end = bounds
+    buf = worker_buffer.buf
+    owned_chars = len(bytes(buf[start:end]).decode("utf-8"))
+    text = bytes(buf[start:window_end]).decode("utf-8")
+    return find_matches(text, worker_patterns, owned_chars)
+
+
+# 줄 단위로 청크 경계 계산 -> (start, end, window_end) 목록, window는 overlap만큼 더 읽음
+def split_chunks(data, chunk_bytes, overlap_bytes):
+    size = len(data)
+    chunks = []
+    start = 0
+    while start < size:
+        end = data.find(b"\n", min(start + chunk_bytes, size))
+        end = size if end == -1 else end + 1
+        window_end = data.find(b"\n", min(end + overlap_bytes, size))
+        window_end = size if window_end == -1 else window_end + 1
+        chunks.append((start, end, window_end))
+        start = end
+    return chunks
+
+
+# 텍스트에서 패턴별 매치 탐지 -> {키: [중복 제거된 값]}, 큰 텍스트는 프로세스 풀로 병렬 스캔
+def scan_text(content, patterns, max_workers=None):
+    if not patterns:
+        return {}
+
+    # cpu가 하나면 프로세스 풀은 오버헤드만 생김
+    workers = max_workers or os.cpu_count() or 1
+    data = content.encode("utf-8") if workers > 1 else b""
+    if workers <= 1 or len(data) < PARALLEL_SCAN_MIN_BYTES:
+        compiled = {key: re.compile(pattern) for key, pattern in patterns.items()}
+        found = find_matches(content, compiled)
+    else:
+        # 겹침은 가장 긴 매치 이상 (utf-8 한 글자 최대 4바이트)
+        longest = max([MAX_MATCH_CHARS] + [len(pattern) for pattern in patterns.values()])
+        chunks = split_chunks(data, SCAN_CHUNK_BYTES, longest * 4)
+
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        try:
+            shm.buf[:len(data)] = data
+            del data
+            found = {key: set() for key in patterns}
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=init_worker,
+                                     initargs=(shm.name, patterns)) as executor:
+                for chunk_found in executor.map(scan_chunk, chunks):
+                    for key, values in chunk_found.items():
+                        found[key].update(values)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    return {key: list(values) for key, values in found.items() if values}